@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import base64
+import re
+import struct
+import zlib
+
+try:
+    import zstandard  # optional: enables the zstd+b64 snapshot codec
+except ImportError:
+    zstandard = None
+
+ZSTD_LEVEL = 3
+
+_B64_CHUNK = 64 * 1024  # multiple of 4, so every slice decodes on its own
+_OUT_CHUNK = 64 * 1024  # cap on each decompressed chunk, however well it compressed
+_WS = re.compile(r"\s")
+
+# snapshot.codec -> snapshot.payload field holding the base64 text
+B64_CODECS = {"gz+b64": "text_gz_b64", "zstd+b64": "text_zstd_b64"}
+
+# base64 of each codec's leading magic bytes (gzip 1f 8b 08, zstd 28 b5 2f fd)
+_B64_MAGIC = {"gz+b64": "H4sI", "zstd+b64": "KLUv"}
+
+# Fixed gzip member header: no filename, mtime=0, OS=unknown. Together with a
+# raw deflate body this makes compressed payloads (and therefore content_hash)
+# byte-reproducible across runs and platforms.
+_GZ_HEADER = b"\x1f\x8b\x08\x00\x00\x00\x00\x00\x00\xff"
+
+_ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+# zstd input fed per decompress() call; a 4-byte RLE block can expand to
+# 128 KiB, so this caps one call's output at about 8 MiB.
+_ZSTD_FEED = 256
+
+
+def gz_compress(data: bytes, level: int = 6) -> bytes:
+    co = zlib.compressobj(level, zlib.DEFLATED, -15)
+    body = co.compress(data) + co.flush()
+    return _GZ_HEADER + body + struct.pack("<II", zlib.crc32(data), len(data) & 0xFFFFFFFF)
+
+
+def _require_zstd():
+    if zstandard is None:
+        raise RuntimeError("codec zstd+b64 requires the optional 'zstandard' package")
+    return zstandard
+
+
+def zstd_compress(data: bytes, level: int = ZSTD_LEVEL) -> bytes:
+    return _require_zstd().ZstdCompressor(level=level).compress(data)
+
+
+def _b64_slices(s: str):
+    if _WS.search(s):
+        # whitespace would shift the 4-char alignment of the slices
+        s = "".join(s.split())
+    for i in range(0, len(s), _B64_CHUNK):
+        yield base64.b64decode(s[i : i + _B64_CHUNK])
+
+
+def iter_b64_gz(s: str):
+    """Yield the inflated bytes of a gz+b64 payload chunk by chunk.
+
+    base64 decode and gzip inflate are fused and every chunk is at most
+    _OUT_CHUNK bytes, so neither the full compressed nor the full decompressed
+    payload is held at once, even for a highly compressible (or hostile) one.
+    Like gzip.decompress, this decodes multi-member streams (as `cat a.gz b.gz`
+    makes) and skips zero padding after a member; any other trailing bytes
+    raise ValueError, a truncated stream EOFError.
+    """
+
+    decomp = zlib.decompressobj(31)
+    for buf in _b64_slices(s):
+        while buf:
+            if decomp.eof:  # between members
+                buf = buf.lstrip(b"\0")
+                if not buf:
+                    break
+                # the magic may be split across two slices
+                if not _GZ_HEADER.startswith(buf[:2]):
+                    raise ValueError("trailing garbage after gzip payload")
+                decomp = zlib.decompressobj(31)
+            out = decomp.decompress(buf, _OUT_CHUNK)
+            if out:
+                yield out
+            buf = decomp.unused_data if decomp.eof else decomp.unconsumed_tail
+    tail = decomp.flush()
+    if tail:
+        yield tail
+    if not decomp.eof:
+        raise EOFError("truncated gzip payload")
+
+
+def iter_b64_zstd(s: str):
+    """Yield the decompressed bytes of a zstd+b64 payload chunk by chunk.
+
+    The zstd counterpart of iter_b64_gz, with the same integrity checks:
+    concatenated frames are all decoded, trailing bytes raise ValueError and a
+    truncated frame EOFError. zstandard's decompressobj has no output cap, so
+    input is fed in _ZSTD_FEED-byte pieces to bound what a single call (of a
+    hostile payload) can expand to.
+    """
+
+    dctx = _require_zstd().ZstdDecompressor()
+    decomp = dctx.decompressobj()
+    pending = bytearray()
+    for buf in _b64_slices(s):
+        while buf:
+            if decomp.eof:  # between frames
+                if not _ZSTD_MAGIC.startswith(buf[:4]):
+                    raise ValueError("trailing garbage after zstd payload")
+                decomp = dctx.decompressobj()
+            piece, buf = buf[:_ZSTD_FEED], buf[_ZSTD_FEED:]
+            pending += decomp.decompress(piece)
+            if decomp.eof:
+                buf = decomp.unused_data + buf
+            if len(pending) >= _OUT_CHUNK:
+                yield bytes(pending)
+                pending.clear()
+    if pending:
+        yield bytes(pending)
+    if not decomp.eof:
+        raise EOFError("truncated zstd payload")
+
+
+def iter_b64_payload(codec: str, b64: str):
+    """Decompressed chunks of a base64 payload for one of B64_CODECS."""
+    if codec == "zstd+b64":
+        return iter_b64_zstd(b64)
+    return iter_b64_gz(b64)
+
+
+def peek_b64_payload(codec: str, b64: str) -> int | None:
+    """Cheap structural check of a base64 payload, without decompressing it.
+
+    Verifies the base64 framing and the codec's magic bytes, and returns the
+    uncompressed size where the format records it at a known offset (the gzip
+    ISIZE trailer, mod 2**32); None otherwise. Raises ValueError if `b64`
+    cannot be a `codec` payload. Corruption inside the stream is not detected.
+    """
+
+    s = "".join(b64.split()) if _WS.search(b64) else b64
+    if len(s) % 4 or not s.startswith(_B64_MAGIC[codec]):
+        raise ValueError(f"not a {codec} payload")
+    if codec != "gz+b64":
+        return None
+    if len(s) < 24:  # 10-byte header + 8-byte trailer at minimum
+        raise ValueError("truncated gzip payload")
+    return struct.unpack("<I", base64.b64decode(s[-12:], validate=True)[-4:])[0]
@@ -0,0 +1,18 @@
+from __future__ import annotations
+
+import os
+
+
+def default_jobs() -> int:
+    """Worker count for --jobs: the CPUs this process may actually run on.
+
+    os.cpu_count() reports every CPU on the host, which oversubscribes under
+    taskset/cgroup cpusets (containers, CI runners). Prefer the affinity mask
+    where the platform exposes it.
+    """
+
+    if hasattr(os, "process_cpu_count"):  # py3.13+
+        return os.process_cpu_count() or 1
+    if hasattr(os, "sched_getaffinity"):  # Linux and some other POSIX
+        return len(os.sched_getaffinity(0)) or 1
+    return os.cpu_count() or 1
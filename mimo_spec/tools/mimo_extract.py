@@ -10,24 +10,122 @@ Note: vault:// resolution is intentionally handled by `mimobrain_memory_system`
 """
 
 import argparse
-import base64
-import gzip
 import json
 import os
+from array import array
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache, partial
 from pathlib import Path
 
-import yaml
+from mimo_spec.tools import yaml_compat
+from mimo_spec.tools.codec import B64_CODECS, iter_b64_payload
+from mimo_spec.tools.jobs import default_jobs
+from mimo_spec.tools.mu_hash import _orjson_safe, orjson, sha256_new
+from mimo_spec.tools.walk import iter_files
 
 
-def b64_gz_decode(s: str) -> str:
-    data = base64.b64decode(s.encode("utf-8"))
-    return gzip.decompress(data).decode("utf-8", errors="ignore")
+def copy_snapshot(snap: dict, sink, sep: bytes = b"") -> bool:
+    """Stream a snapshot's text (preceded by `sep`) into a binary sink.
 
+    Returns False if the payload is missing or cannot be decoded; a payload
+    that fails part-way is rolled back, so the sink never holds partial text.
+    """
+
+    payload = snap.get("payload")
+    if not isinstance(payload, dict):
+        return False
+    codec = snap.get("codec")
+    if codec in B64_CODECS and isinstance(payload.get(B64_CODECS[codec]), str):
+        start = sink.tell()
+        try:
+            chunks = iter(iter_b64_payload(codec, payload[B64_CODECS[codec]]))
+            sink.write(sep + next(chunks, b""))
+            for chunk in chunks:
+                sink.write(chunk)
+        except Exception:  # undecodable, or zstandard not installed
+            sink.seek(start)
+            sink.truncate()
+            return False
+        return True
+    if codec == "plain" and isinstance(payload.get("text"), str):
+        sink.write(sep + payload["text"].encode("utf-8"))
+        return True
+    return False
+
+
+def _parse_mimo(p: Path):
+    return yaml_compat.load_bytes(p.read_bytes())
+
+
+def _json_exact(obj) -> bool:
+    """True if `obj` survives a JSON round trip unchanged.
+
+    YAML can also yield dates, timestamps, bytes, sets and non-string keys;
+    documents holding those are simply not cached.
+    """
+
+    if obj is None or isinstance(obj, (str, int, float)):
+        return True
+    if isinstance(obj, list):
+        return all(_json_exact(v) for v in obj)
+    if isinstance(obj, dict):
+        return all(isinstance(k, str) and _json_exact(v) for k, v in obj.items())
+    return False
+
+
+def _cache_entry(cache_dir: Path, p: Path) -> Path:
+    # Keyed by (path, mtime, size): any rewrite of the .mimo invalidates the entry.
+    # One stat per file; abspath (unlike resolve) needs no per-component lstat.
+    st = p.stat()
+    key = f"{os.path.abspath(p)}\0{st.st_mtime_ns}\0{st.st_size}"
+    return cache_dir / (sha256_new(key.encode("utf-8")).hexdigest() + ".json")
+
+
+def load_mimo(path: str | Path, cache_dir: Path | None = None):
+    """Parse a .mimo file.
+
+    When `cache_dir` is given, the parsed document is memoized on disk (as
+    JSON, never pickle: entries are data, not code) so unchanged files skip the
+    YAML parse on later runs.
+    """
 
-def load_mimo(path: str | Path):
     p = Path(path)
-    return yaml.safe_load(p.read_text(encoding="utf-8", errors="ignore"))
+    if cache_dir is None:
+        return _parse_mimo(p)
+
+    entry = _cache_entry(cache_dir, p)
+    try:
+        return json.loads(entry.read_bytes())
+    except (OSError, ValueError):
+        pass
+
+    data = _parse_mimo(p)
+    if not _json_exact(data):
+        return data
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp = entry.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, entry)
+    except OSError:
+        # cache is best-effort; never fail extraction because of it
+        pass
+    return data
+
+
+def load_mimo_many(paths: list[Path], cache_dir: Path | None = None, jobs: int = 1) -> list:
+    """Parse many .mimo files, preserving input order.
+
+    Processes, not threads: PyYAML holds the GIL for the whole parse, even
+    with the libyaml C loader. chunksize amortizes pickling the documents
+    back to the parent.
+    """
+
+    if jobs <= 1 or len(paths) < 2:
+        return [load_mimo(p, cache_dir) for p in paths]
+    with ProcessPoolExecutor(max_workers=jobs) as ex:
+        return list(ex.map(partial(load_mimo, cache_dir=cache_dir), paths, chunksize=16))
 
 
 def group_key(meta: dict) -> str:
@@ -51,9 +149,51 @@ def write_text(path: Path, text: str) -> None:
     path.write_text(text, encoding="utf-8")
 
 
-def _read_lines(pth: str) -> list[str]:
-    with open(pth, "r", encoding="utf-8", errors="ignore") as f:
-        return f.readlines()
+def write_json(path: Path, obj) -> None:
+    # orjson only where its output is byte-identical (see mu_hash._orjson_safe);
+    # YAML can hand us int keys, big ints and floats, which json.dumps handles.
+    if orjson is not None and _orjson_safe(obj):
+        try:
+            path.write_bytes(orjson.dumps(obj, option=orjson.OPT_INDENT_2))
+            return
+        except orjson.JSONEncodeError:
+            pass
+    path.write_text(json.dumps(obj, ensure_ascii=False, indent=2), encoding="utf-8")
+
+
+@lru_cache(maxsize=128)
+def _line_index(pth: str) -> array:
+    """Byte offset of every line start in `pth` (plus end-of-file).
+
+    Memoized: a group usually has many pointers into the same raw file, and
+    each range is then a single seek + read. main() clears the cache between
+    groups to bound memory.
+    """
+
+    offsets = array("q", [0])
+    pos = 0
+    # latin-1 maps bytes 1:1 to chars, so len(line) is a byte count; newline=""
+    # splits on \r\n, \r and \n alike, as the text-mode reads this replaced did.
+    with open(pth, "r", encoding="latin-1", newline="") as f:
+        for line in f:
+            pos += len(line)
+            offsets.append(pos)
+    return offsets
+
+
+def read_line_range(pth: str, start: int, end: int) -> str:
+    """Lines start..end (1-indexed, inclusive) of a text file."""
+
+    offsets = _line_index(pth)
+    last = len(offsets) - 1
+    if start > last:
+        return ""
+    end = min(end, last)
+    with open(pth, "rb") as f:
+        f.seek(offsets[start - 1])
+        data = f.read(offsets[end] - offsets[start - 1])
+    # match text-mode reads (universal newlines)
+    return data.decode("utf-8", errors="ignore").replace("\r\n", "\n").replace("\r", "\n")
 
 
 def resolve_pointer_snippet(pointer: dict) -> str | None:
@@ -84,11 +224,13 @@ def resolve_pointer_snippet(pointer: dict) -> str | None:
         else:
             pth = uri
 
-    if not pth or not isinstance(pth, str) or not os.path.exists(pth):
+    if not pth or not isinstance(pth, str):
         return None
 
-    lines = _read_lines(pth)
-    return "".join(lines[start - 1 : end])
+    try:
+        return read_line_range(pth, start, end)
+    except (OSError, ValueError):  # missing/unreadable source, or a path open() rejects (NUL byte)
+        return None
 
 
 def main(argv: list[str] | None = None) -> int:
@@ -100,16 +242,41 @@ def main(argv: list[str] | None = None) -> int:
         required=True,
         help="Output directory for reconstructed artifacts",
     )
+    ap.add_argument(
+        "--cache-dir",
+        default=None,
+        help="Reuse parsed .mimo files unchanged since the last run (off by default)",
+    )
+    # The cache used to be on by default and --no-cache was how to turn it off.
+    # It is opt-in now, but the flag stays so existing command lines keep working.
+    ap.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Disable the parse cache: the default since it became opt-in; kept for old scripts (overrides --cache-dir)",
+    )
+    ap.add_argument(
+        "--jobs",
+        type=int,
+        default=default_jobs(),
+        help="Parallel workers for parsing .mimo files (default: usable CPUs)",
+    )
+    ap.add_argument(
+        "--snapshot-text",
+        action="store_true",
+        help="Also write snapshot.txt per group: the MU snapshot texts joined by newlines (not byte-exact)",
+    )
     ns = ap.parse_args(argv)
 
     in_path = Path(ns.in_path)
     out_root = Path(ns.out_dir)
     out_root.mkdir(parents=True, exist_ok=True)
 
+    cache_dir = Path(ns.cache_dir) if ns.cache_dir and not ns.no_cache else None
+
     groups: dict[str, list[tuple[Path, dict]]] = defaultdict(list)
 
-    for p in sorted(in_path.rglob("*.mimo")):
-        data = load_mimo(p)
+    paths = iter_files(in_path, {".mimo"})
+    for p, data in zip(paths, load_mimo_many(paths, cache_dir, ns.jobs)):
         if not isinstance(data, dict):
             continue
         meta = data.get("meta", {}) if isinstance(data.get("meta"), dict) else {}
@@ -121,41 +288,54 @@ def main(argv: list[str] | None = None) -> int:
     for gid, items in groups.items():
         items.sort(key=lambda x: order_key(x[1].get("meta", {}) if isinstance(x[1], dict) else {}))
 
-        summaries: list[str] = []
         pointers: list[dict] = []
-        snippets: list[str] = []
 
         filename = None
-        for path, data in items:
+        for _, data in items:
             meta = data.get("meta", {}) if isinstance(data.get("meta"), dict) else {}
-            if not filename:
-                filename = meta.get("source_filename")
-            summaries.append(str(data.get("summary") or ""))
-
-            ps = data.get("pointer") or []
-            if isinstance(ps, list):
-                for p in ps:
-                    if isinstance(p, dict):
-                        pointers.append(p)
-                        sn = resolve_pointer_snippet(p)
-                        if sn:
-                            snippets.append(sn)
+            filename = meta.get("source_filename")
+            if filename:
+                break
 
         base = filename or gid
         out_dir = out_root / base
         out_dir.mkdir(parents=True, exist_ok=True)
 
-        write_text(out_dir / "summary.txt", "\n\n".join(summaries))
-        write_text(out_dir / "snippets.txt", "\n\n".join(snippets))
-        (out_dir / "pointers.json").write_text(
-            json.dumps(pointers, ensure_ascii=False, indent=2), encoding="utf-8"
-        )
+        # Text outputs are streamed straight to disk, one MU at a time, so
+        # reconstructing a large document never holds it all in memory.
+        if ns.snapshot_text:
+            with (out_dir / "snapshot.txt").open("wb") as sink:
+                sep = b""
+                for _, data in items:
+                    snap = data.get("snapshot")
+                    if isinstance(snap, dict) and copy_snapshot(snap, sink, sep):
+                        sep = b"\n"
+
+        with (out_dir / "summary.txt").open("wb") as summary_sink, (
+            out_dir / "snippets.txt"
+        ).open("wb") as snippet_sink:
+            snippet_sep = b""
+            for i, (path, data) in enumerate(items):
+                if i:
+                    summary_sink.write(b"\n\n")
+                summary_sink.write(str(data.get("summary") or "").encode("utf-8"))
+
+                ps = data.get("pointer") or []
+                if isinstance(ps, list):
+                    for p in ps:
+                        if isinstance(p, dict):
+                            pointers.append(p)
+                            sn = resolve_pointer_snippet(p)
+                            if sn:
+                                snippet_sink.write(snippet_sep + sn.encode("utf-8"))
+                                snippet_sep = b"\n\n"
+        _line_index.cache_clear()
+
+        write_json(out_dir / "pointers.json", pointers)
 
         index.append({"group_id": gid, "out_dir": str(out_dir)})
 
-    (out_root / "index.json").write_text(
-        json.dumps(index, ensure_ascii=False, indent=2), encoding="utf-8"
-    )
+    write_json(out_root / "index.json", index)
 
     return 0
 
@@ -13,47 +13,71 @@ This tool is intentionally minimal: text-like inputs only (md/txt/html/rtf).
 
 import argparse
 import base64
-import gzip
 import hashlib
-import json
+import mmap
+import os
+import re
+from array import array
+from collections import deque
+from concurrent.futures import Executor, ThreadPoolExecutor
 from dataclasses import dataclass
 from datetime import datetime, timezone
+from functools import partial
+from itertools import islice
 from pathlib import Path
 from typing import Any
 
 import yaml
 
+from mimo_spec.tools.codec import B64_CODECS, gz_compress, zstandard, zstd_compress
+from mimo_spec.tools.jobs import default_jobs
+from mimo_spec.tools.mu_hash import (  # noqa: F401
+    canonical_json,
+    canonical_json_bytes,
+    sha256_new,
+    sha256_prefixed,
+)
+from mimo_spec.tools.walk import iter_files
+from mimo_spec.tools.yaml_compat import SafeDumper
+
 TEXT_EXTS = {".md", ".txt", ".html", ".rtf"}
 
 
-def now_iso_z() -> str:
+def now_iso_z(at: datetime | None = None) -> str:
     return (
-        datetime.now(timezone.utc)
+        (at or datetime.now(timezone.utc))
         .replace(microsecond=0)
         .isoformat()
         .replace("+00:00", "Z")
     )
 
 
+_MMAP_HASH_MIN = 8 * 1024 * 1024
+
+
 def sha256_file_hex(path: Path) -> str:
-    h = hashlib.sha256()
     with path.open("rb") as f:
-        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+        if os.fstat(f.fileno()).st_size >= _MMAP_HASH_MIN:
+            # one update() over the mapping: no Python-level chunking, GIL released
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                return sha256_new(mm).hexdigest()
+        if hasattr(hashlib, "file_digest"):  # py3.11+: read/update loop runs in C
+            return hashlib.file_digest(f, sha256_new).hexdigest()
+        h = sha256_new()
+        for chunk in iter(lambda: f.read(4 * 1024 * 1024), b""):
             h.update(chunk)
-    return h.hexdigest()
+        return h.hexdigest()
 
 
-def sha256_prefixed(data: bytes) -> str:
-    return "sha256:" + hashlib.sha256(data).hexdigest()
-
+def gz_b64(s: str) -> str:
+    return base64.b64encode(gz_compress(s.encode("utf-8"))).decode("ascii")
 
-def canonical_json(obj: Any) -> str:
-    return json.dumps(obj, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
 
+_COMPRESSORS = {"gz+b64": gz_compress, "zstd+b64": zstd_compress}
 
-def gz_b64(s: str) -> str:
-    comp = gzip.compress(s.encode("utf-8"))
-    return base64.b64encode(comp).decode("utf-8")
+# Oldest schema_version whose contract allows each snapshot codec; gz+b64
+# output stays 1.1 so existing readers keep accepting it.
+_SCHEMA_VERSIONS = {"gz+b64": "1.1", "zstd+b64": "1.2"}
 
 
 def safe_summary(text: str, limit: int = 400) -> str:
@@ -86,66 +110,179 @@ def parse_split(s: str) -> SplitSpec:
     return SplitSpec(strategy=strat, window=window)
 
 
+# Hash seeds are fed to sha256 member by member in canonical (sorted) key order,
+# which yields the same digest as hashing canonical_json(seed) without building
+# the seed dict or its full serialization.
+_MU_KEY_HEAD = sha256_new(b'{"locator":')
+_CONTENT_HASH_HEAD = sha256_new(b'{"schema_version":')
+
+
 def compute_mu_key(*, raw_sha256: str, locator: dict, split: dict) -> str:
-    seed = canonical_json({"raw_sha256": raw_sha256, "locator": locator, "split": split})
-    return sha256_prefixed(seed.encode("utf-8"))
+    h = _MU_KEY_HEAD.copy()
+    h.update(canonical_json_bytes(locator))
+    h.update(b',"raw_sha256":')
+    h.update(canonical_json_bytes(raw_sha256))
+    h.update(b',"split":')
+    h.update(canonical_json_bytes(split))
+    h.update(b"}")
+    return "sha256:" + h.hexdigest()
 
 
-def compute_content_hash(*, schema_version: str, summary: str, snapshot: dict) -> str:
-    seed = canonical_json(
-        {
-            "schema_version": schema_version,
-            "summary": summary,
-            "snapshot": {
-                "kind": snapshot.get("kind"),
-                "codec": snapshot.get("codec"),
-                "payload": snapshot.get("payload"),
-            },
-        }
-    )
-    return sha256_prefixed(seed.encode("utf-8"))
+_LINE_WINDOW_HEAD = sha256_new(b'{"locator":{"end":')
+
+
+def line_window_mu_keys(*, raw_sha256: str, split_spec: SplitSpec, total: int):
+    """mu_key for window i of a line_window split, with every constant pre-serialized.
+
+    Only the integers (locator end/start, split index) are formatted per MU;
+    the rest of the canonical seed is fixed bytes. Same digest as compute_mu_key.
+    """
+
+    mid = (
+        ',"kind":"line_range","start":%d},"raw_sha256":'
+        + canonical_json(raw_sha256).replace("%", "%%")
+        + ',"split":{"index":%d,"strategy":'
+        + canonical_json(split_spec.strategy).replace("%", "%%")
+        + f',"total":{total},"window":{split_spec.window}}}}}'
+    ).encode("utf-8")
 
+    def mu_key(i: int, start: int, end: int) -> str:
+        h = _LINE_WINDOW_HEAD.copy()
+        h.update(b"%d" % end + mid % (start, i))
+        return "sha256:" + h.hexdigest()
 
-def make_snapshot(*, source_uri: str, raw_sha256: str, text: str) -> dict:
-    raw = text.encode("utf-8")
+    return mu_key
+
+
+def compute_content_hash(*, schema_version: str, summary: str, snapshot: dict) -> str:
+    h = _CONTENT_HASH_HEAD.copy()
+    h.update(canonical_json_bytes(schema_version))
+    h.update(b',"snapshot":{"codec":')
+    h.update(canonical_json_bytes(snapshot.get("codec")))
+    h.update(b',"kind":')
+    h.update(canonical_json_bytes(snapshot.get("kind")))
+    h.update(b',"payload":')
+    h.update(canonical_json_bytes(snapshot.get("payload")))
+    h.update(b'},"summary":')
+    h.update(canonical_json_bytes(summary))
+    h.update(b"}")
+    return "sha256:" + h.hexdigest()
+
+
+def make_snapshot(
+    *,
+    source_uri: str,
+    raw_sha256: str,
+    text: str,
+    created_at: str | None = None,
+    codec: str = "gz+b64",
+) -> dict:
+    raw = text.encode("utf-8")  # encoded once: size_bytes and payload share it
     sha = f"sha256:{raw_sha256}"
     return {
         "kind": "text",
-        "codec": "gz+b64",
+        "codec": codec,
         "size_bytes": len(raw),
-        "created_at": now_iso_z(),
+        "created_at": created_at or now_iso_z(),
         "source_ref": {"uri": source_uri, "sha256": sha, "raw_id": sha},
-        "payload": {"text_gz_b64": gz_b64(text)},
+        "payload": {B64_CODECS[codec]: base64.b64encode(_COMPRESSORS[codec](raw)).decode("ascii")},
         "meta": {},
     }
 
 
-def vault_raw_uri(*, vault_id: str, raw_sha256: str, ext: str) -> str:
+def vault_raw_uri(*, vault_id: str, raw_sha256: str, ext: str, at: datetime | None = None) -> str:
     # Mirror vault_ingest naming: vault://default/raw/YYYY/MM/<sha>.<ext>
     # We don't try to preserve original filenames.
-    dt = datetime.now(timezone.utc)
-    yyyy = dt.strftime("%Y")
-    mm = dt.strftime("%m")
+    dt = at or datetime.now(timezone.utc)
     ext = ext.lstrip(".") or "txt"
-    return f"vault://{vault_id}/raw/{yyyy}/{mm}/{raw_sha256}.{ext}"
+    return f"vault://{vault_id}/raw/{dt:%Y/%m}/{raw_sha256}.{ext}"
+
 
+def iter_text_files(in_dir: Path, out_dir: Path | None = None) -> list[Path]:
+    # An --out nested inside --in is not input; don't descend into it.
+    return iter_files(in_dir, TEXT_EXTS, skip_dirs=[out_dir] if out_dir is not None else ())
 
-def iter_text_files(in_dir: Path) -> list[Path]:
-    files: list[Path] = []
-    for p in sorted(in_dir.rglob("*")):
-        if p.is_file() and p.suffix.lower() in TEXT_EXTS:
-            files.append(p)
-    return files
+
+# Every boundary str.splitlines() recognizes, folded to "\n" up front.
+_LINE_BREAKS = re.compile("\r\n|[\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029]")
+
+
+def normalize_newlines(text: str) -> str:
+    return _LINE_BREAKS.sub("\n", text)
+
+
+def window_bounds(text: str, window: int) -> tuple[int, array]:
+    """Split newline-normalized `text` into `window`-line slices by offset.
+
+    Returns (line_count, bounds) where slice i is text[bounds[i]:bounds[i + 1]].
+    Only the window boundaries are kept, not a list of line strings.
+    """
+
+    bounds = array("q", [0])
+    n_lines = 0
+    pos = 0
+    end = len(text)
+    while pos < end:
+        nl = text.find("\n", pos)
+        pos = end if nl < 0 else nl + 1
+        n_lines += 1
+        if n_lines % window == 0 and pos < end:
+            bounds.append(pos)
+    bounds.append(end)
+    return n_lines, bounds
 
 
 def read_text_best_effort(path: Path) -> str:
     return path.read_text(encoding="utf-8", errors="ignore")
 
 
+def load_existing_mu_keys(out_dir: Path) -> set[str]:
+    """Collect idempotency.mu_key from .mimo files already in `out_dir`.
+
+    Grep-style scan of the `  mu_key:` line (as written by write_mimo) rather
+    than a full YAML load of every file.
+    """
+
+    keys: set[str] = set()
+    if not out_dir.is_dir():
+        return keys
+    for p in iter_files(out_dir, {".mimo"}):
+        try:
+            with p.open("rb") as f:
+                for line in f:
+                    if line.startswith(b"  mu_key:"):
+                        key = line.split(b":", 1)[1].strip().strip(b"'\"").decode("utf-8", errors="ignore")
+                        if key:
+                            keys.add(key)
+                        break
+        except OSError:
+            continue
+    return keys
+
+
+def dump_mimo(mimo: dict) -> bytes:
+    return yaml.dump(mimo, Dumper=SafeDumper, allow_unicode=True, sort_keys=False, encoding="utf-8")
+
+
 def write_mimo(path: Path, mimo: dict) -> None:
     path.parent.mkdir(parents=True, exist_ok=True)
-    with path.open("w", encoding="utf-8", newline="\n") as f:
-        yaml.safe_dump(mimo, f, allow_unicode=True, sort_keys=False)
+    path.write_bytes(dump_mimo(mimo))
+
+
+def write_mimo_batch(items: list[tuple[Path, bytes]], pool: Executor | None = None) -> None:
+    """Write pre-serialized MUs, on `pool` when given to overlap per-file
+    open/write latency.
+
+    The pool is the caller's, so one set of writer threads serves every batch
+    of a run. Parent directories must already exist.
+    """
+
+    if pool is None or len(items) < 2:
+        for path, data in items:
+            path.write_bytes(data)
+        return
+    for _ in pool.map(lambda item: item[0].write_bytes(item[1]), items):
+        pass
 
 
 def write_mu_v1_1(
@@ -158,18 +295,27 @@ def write_mu_v1_1(
     struct_data=None,
     dedup: str = "skip",
     existing_mu_keys: set[str] | None = None,
+    raw_sha256_hex: str | None = None,
 ) -> bool:
     """Backward-compatible helper used by older tests.
 
-    This keeps the public API stable while the CLI evolves.
+    This keeps the public API stable while the CLI evolves. Callers that
+    already hold the raw bytes of pointer.path can pass their digest as
+    `raw_sha256_hex` (bare hex; a "sha256:" prefix is tolerated) to skip
+    re-reading the file. It requires a pointer with a path.
     """
 
     existing_mu_keys = existing_mu_keys or set()
 
     # legacy pointer may include path/timestamp; normalize if possible
     raw_path = pointer.get("path") if isinstance(pointer, dict) else None
+    if raw_sha256_hex is not None and not (isinstance(raw_path, str) and raw_path):
+        raise ValueError("raw_sha256_hex given, but pointer has no path to describe")
     if isinstance(raw_path, str) and raw_path:
-        raw_sha_hex = sha256_file_hex(Path(raw_path))
+        if raw_sha256_hex is not None:
+            raw_sha_hex = raw_sha256_hex.removeprefix("sha256:")
+        else:
+            raw_sha_hex = sha256_file_hex(Path(raw_path))
         uri = "file:///" + raw_path.replace("\\", "/")
     else:
         raw_sha_hex = "0" * 64
@@ -210,37 +356,59 @@ def write_mu_v1_1(
     return True
 
 
-def build_mus_for_file(
+def prepare_mus_for_file(
     *,
     raw_path: Path,
     out_dir: Path,
     source_kind: str,
     split_spec: SplitSpec,
     vault_id: str,
-) -> int:
-    text = read_text_best_effort(raw_path)
-    lines = text.splitlines()
+    run_at: datetime | None = None,
+    existing_mu_keys: set[str] | None = None,
+    codec: str = "gz+b64",
+) -> list[tuple[str, Path, bytes]]:
+    """Build and serialize the MUs of one raw file without writing them.
+
+    Returns (mu_key, out_path, yaml_bytes) per MU. Windows whose mu_key is
+    already in `existing_mu_keys` are skipped early; the set is only read here,
+    so this is safe to run concurrently for different files.
+    """
+
+    # main() passes one run-wide timestamp so all MUs share meta.time/created_at.
+    run_at = run_at or datetime.now(timezone.utc)
+    run_ts = now_iso_z(run_at)
+
+    # Read the raw file once: hash and text come from the same bytes.
+    # (normalize_newlines also covers the CR/CRLF folding text-mode reads did.)
+    data = raw_path.read_bytes()
+    raw_sha_hex = sha256_new(data).hexdigest()
+    text = normalize_newlines(data.decode("utf-8", errors="ignore"))
+    del data
+    n_lines, bounds = window_bounds(text, split_spec.window)
 
-    raw_sha_hex = sha256_file_hex(raw_path)
     raw_sha = f"sha256:{raw_sha_hex}"
 
     # Stable group_id derived from raw sha256
     group_id = f"grp_{raw_sha_hex[:12]}"
 
-    total = max(1, (len(lines) + split_spec.window - 1) // split_spec.window)
+    total = len(bounds) - 1
+    mu_key_of = line_window_mu_keys(raw_sha256=raw_sha, split_spec=split_spec, total=total)
+    schema_version = _SCHEMA_VERSIONS[codec]
+    uri = vault_raw_uri(vault_id=vault_id, raw_sha256=raw_sha_hex, ext=raw_path.suffix, at=run_at)
 
-    written = 0
+    prepared: list[tuple[str, Path, bytes]] = []
     for i in range(total):
         start = i * split_spec.window
-        end = min(len(lines), (i + 1) * split_spec.window)
+        end = min(n_lines, (i + 1) * split_spec.window)
         # 1-indexed line numbers in locator
         locator = {"kind": "line_range", "start": start + 1, "end": end}
-        split = {"strategy": split_spec.strategy, "index": i, "total": total, "window": split_spec.window}
 
-        snippet_lines = lines[start:end]
-        snippet = "\n".join(snippet_lines).strip() or "(empty)"
+        mu_key = mu_key_of(i, start + 1, end)
+        if existing_mu_keys is not None and mu_key in existing_mu_keys:
+            continue  # --dedup=skip: same source, same slice already packed
+
+        snippet = text[bounds[i] : bounds[i + 1]].strip() or "(empty)"
 
-        uri = vault_raw_uri(vault_id=vault_id, raw_sha256=raw_sha_hex, ext=raw_path.suffix)
         pointer = {
             "type": "raw",
             "uri": uri,
@@ -249,7 +417,7 @@ def build_mus_for_file(
         }
 
         meta: dict[str, Any] = {
-            "time": now_iso_z(),
+            "time": run_ts,
             "source": source_kind,
             "group_id": group_id,
             "order": f"{i+1}/{total}",
@@ -262,15 +430,14 @@ def build_mus_for_file(
         # NOTE: workspace/project scoping must NOT be stored inside MU.
         # It is represented by a local membership layer (relationship table/event log).
 
-        mu_key = compute_mu_key(raw_sha256=raw_sha, locator=locator, split=split)
-        snap = make_snapshot(source_uri=uri, raw_sha256=raw_sha_hex, text=snippet)
+        snap = make_snapshot(source_uri=uri, raw_sha256=raw_sha_hex, text=snippet, created_at=run_ts, codec=codec)
 
         summary = safe_summary(snippet)
-        content_hash = compute_content_hash(schema_version="1.1", summary=summary, snapshot=snap)
+        content_hash = compute_content_hash(schema_version=schema_version, summary=summary, snapshot=snap)
 
         mu_id = f"mu_{group_id}_{i+1:03d}"
         mimo = {
-            "schema_version": "1.1",
+            "schema_version": schema_version,
             "mu_id": mu_id,
             "content_hash": content_hash,
             "idempotency": {"mu_key": mu_key},
@@ -288,11 +455,53 @@ def build_mus_for_file(
             },
         }
 
-        out_path = out_dir / f"{mu_id}.mimo"
-        write_mimo(out_path, mimo)
-        written += 1
+        prepared.append((mu_key, out_dir / f"{mu_id}.mimo", dump_mimo(mimo)))
 
-    return written
+    return prepared
+
+
+def write_prepared(
+    prepared: list[tuple[str, Path, bytes]],
+    out_dir: Path,
+    existing_mu_keys: set[str] | None = None,
+    pool: Executor | None = None,
+) -> int:
+    """Claim mu_keys (dedup) and write the MUs from prepare_mus_for_file."""
+
+    batch: list[tuple[Path, bytes]] = []
+    for mu_key, path, data in prepared:
+        if existing_mu_keys is not None:
+            if mu_key in existing_mu_keys:
+                continue
+            existing_mu_keys.add(mu_key)
+        batch.append((path, data))
+    out_dir.mkdir(parents=True, exist_ok=True)
+    write_mimo_batch(batch, pool)
+    return len(batch)
+
+
+def build_mus_for_file(
+    *,
+    raw_path: Path,
+    out_dir: Path,
+    source_kind: str,
+    split_spec: SplitSpec,
+    vault_id: str,
+    run_at: datetime | None = None,
+    existing_mu_keys: set[str] | None = None,
+    codec: str = "gz+b64",
+) -> int:
+    prepared = prepare_mus_for_file(
+        raw_path=raw_path,
+        out_dir=out_dir,
+        source_kind=source_kind,
+        split_spec=split_spec,
+        vault_id=vault_id,
+        run_at=run_at,
+        existing_mu_keys=existing_mu_keys,
+        codec=codec,
+    )
+    return write_prepared(prepared, out_dir, existing_mu_keys)
 
 
 def main(argv: list[str] | None = None) -> int:
@@ -304,6 +513,18 @@ def main(argv: list[str] | None = None) -> int:
     ap.add_argument("--split", required=True, help="split strategy, e.g. line_window:400")
     ap.add_argument("--vault-id", default="default", help="vault id used in vault:// URIs")
     ap.add_argument("--dedup", default="skip", choices=["skip"], help="(MVP) dedup policy")
+    ap.add_argument(
+        "--codec",
+        default="gz+b64",
+        choices=sorted(B64_CODECS),
+        help="snapshot codec (zstd+b64 needs the optional zstandard package and writes schema_version 1.2)",
+    )
+    ap.add_argument(
+        "--jobs",
+        type=int,
+        default=default_jobs(),
+        help="Parallel workers for reading/hashing/serializing inputs (default: usable CPUs)",
+    )
 
     ns = ap.parse_args(argv)
 
@@ -313,21 +534,42 @@ def main(argv: list[str] | None = None) -> int:
         raise SystemExit(f"missing input: {in_dir}")
 
     split_spec = parse_split(ns.split)
+    if ns.codec == "zstd+b64" and zstandard is None:
+        raise SystemExit("--codec zstd+b64 requires the zstandard package")
 
-    files = iter_text_files(in_dir)
+    files = iter_text_files(in_dir, out_dir)
     if not files:
         print("no supported input files")
         return 0
 
+    run_at = datetime.now(timezone.utc)
+    existing_mu_keys = load_existing_mu_keys(out_dir) if ns.dedup == "skip" else None
+    prepare = partial(
+        prepare_mus_for_file,
+        out_dir=out_dir,
+        source_kind=ns.source,
+        split_spec=split_spec,
+        vault_id=ns.vault_id,
+        run_at=run_at,
+        existing_mu_keys=existing_mu_keys,
+        codec=ns.codec,
+    )
+
+    # Files are prepared concurrently, but mu_keys are claimed and MUs written
+    # in sorted input order, so dedup outcomes do not depend on scheduling.
+    # At most 2*jobs files are in flight (ex.map would queue them all), which
+    # bounds memory to a few files' worth of prepared MUs. One writer pool,
+    # sized like the prepare pool, serves every file's batch.
+    jobs = max(1, ns.jobs)
     total_written = 0
-    for f in files:
-        total_written += build_mus_for_file(
-            raw_path=f,
-            out_dir=out_dir,
-            source_kind=ns.source,
-            split_spec=split_spec,
-            vault_id=ns.vault_id,
-        )
+    with ThreadPoolExecutor(max_workers=jobs) as ex, ThreadPoolExecutor(max_workers=jobs) as writer:
+        pending = iter(files)
+        window = deque(ex.submit(prepare, raw_path=f) for f in islice(pending, 2 * jobs))
+        while window:
+            prepared = window.popleft().result()
+            for f in islice(pending, 1):
+                window.append(ex.submit(prepare, raw_path=f))
+            total_written += write_prepared(prepared, out_dir, existing_mu_keys, writer)
 
     print(f"written_mus={total_written}")
     return 0
@@ -1,15 +1,22 @@
 from __future__ import annotations
 
 import argparse
-import base64
-import gzip
 import json
 import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache, partial
+from importlib import metadata
 from pathlib import Path
 
 import jsonschema
-import yaml
+
+from mimo_spec.tools import codec as payload_codec
+from mimo_spec.tools import yaml_compat
+from mimo_spec.tools.codec import B64_CODECS, iter_b64_payload, peek_b64_payload
+from mimo_spec.tools.jobs import default_jobs
+from mimo_spec.tools.mu_hash import sha256_new
+from mimo_spec.tools.walk import iter_files
 
 try:
     sys.stdout.reconfigure(encoding="utf-8")
@@ -43,21 +50,68 @@ REQUIRED_META = [
     "has_struct_data",
 ]
 
+# Set forms for the all-present fast path; the lists keep reporting order stable.
+_REQUIRED_TOP_V1_0 = frozenset(REQUIRED_TOP_V1_0)
+_REQUIRED_TOP_V1_1 = frozenset(REQUIRED_TOP_V1_1)
+_REQUIRED_META = frozenset(REQUIRED_META)
+
 # Pointer+Locator v0.1 (new style)
 LOCATOR_KINDS = {"line_range", "byte_range", "page_range", "time_range", "bbox"}
 
+_PRINT_BATCH = 100  # files per stdout write
+
+CACHE_FILE = "validate_cache.json"
+CACHE_MAX_ENTRIES = 10_000
+
+_CONTRACTS = Path(__file__).resolve().parents[1] / "contracts"
+
+# schema_version -> JSON Schema contract enforced on top of the checks below
+MU_SCHEMAS = {
+    "1.1": _CONTRACTS / "mu_v1_1.schema.json",
+    "1.2": _CONTRACTS / "mu_v1_2.schema.json",  # 1.1 + the zstd+b64 snapshot codec
+}
+
+
+@lru_cache(maxsize=None)
+def schema_validator(schema_version: str):
+    """The MU contract for `schema_version` as a ready validator.
+
+    Built on first use and then reused for every file of that version; worker
+    processes each build their own the same way.
+    """
+    schema = json.loads(MU_SCHEMAS[schema_version].read_text(encoding="utf-8"))
+    cls = jsonschema.validators.validator_for(schema)
+    cls.check_schema(schema)
+    return cls(schema)
+
+
+@lru_cache(maxsize=256)
+def payload_size(codec: str, b64: str) -> int:
+    """Decoded size of a base64 snapshot payload, counted chunk by chunk.
+
+    The whole stream is still checked (CRC, truncation) without ever being held.
+    Memoized within a run: MUs that carry the same snapshot text (repeated
+    boilerplate, "(empty)" windows) are decoded once.
+    """
+    return sum(len(chunk) for chunk in iter_b64_payload(codec, b64))
+
 
 def err(code, path, msg):
     return {"code": code, "path": path, "msg": msg}
 
 
-def validate_file(path: str) -> tuple[list[dict], list[dict]]:
+def validate_file(path: str, *, decode_payloads: bool = True) -> tuple[list[dict], list[dict]]:
+    """Check one .mimo file; returns (errors, warnings).
+
+    With `decode_payloads=False`, base64 snapshot payloads only get the cheap
+    structural check of codec.peek_b64_payload instead of a full decode.
+    """
+
     errors: list[dict] = []
     warnings: list[dict] = []
 
     try:
-        with open(path, "r", encoding="utf-8", errors="ignore") as f:
-            data = yaml.safe_load(f)
+        data = yaml_compat.load_bytes(Path(path).read_bytes())
     except Exception as e:
         return [err("E_YAML", path, f"YAML parse error: {e}")], []
 
@@ -66,21 +120,26 @@ def validate_file(path: str) -> tuple[list[dict], list[dict]]:
 
     sv = str(data.get("schema_version") or "")
 
-    required = REQUIRED_TOP_V1_1 if sv == "1.1" else REQUIRED_TOP_V1_0
-    for k in required:
-        if k not in data:
-            errors.append(err("E_REQUIRED", path, f"Missing: {k}"))
-
-    # v1.1: enforce JSON Schema contract (when present)
-    if sv == "1.1":
-        schema_path = Path(__file__).resolve().parents[1] / "contracts" / "mu_v1_1.schema.json"
+    if sv in {"1.1", "1.2"}:
+        required, required_set = REQUIRED_TOP_V1_1, _REQUIRED_TOP_V1_1
+    else:
+        required, required_set = REQUIRED_TOP_V1_0, _REQUIRED_TOP_V1_0
+    if not required_set <= data.keys():
+        for k in required:
+            if k not in data:
+                errors.append(err("E_REQUIRED", path, f"Missing: {k}"))
+
+    # enforce the JSON Schema contract (when present)
+    if sv in MU_SCHEMAS:
         try:
-            schema = json.loads(schema_path.read_text(encoding="utf-8"))
-            jsonschema.validate(instance=data, schema=schema)
+            # same error jsonschema.validate() would raise, minus the per-file schema compile
+            error = jsonschema.exceptions.best_match(schema_validator(sv).iter_errors(data))
+            if error is not None:
+                raise error
         except jsonschema.exceptions.ValidationError as e:
-            errors.append(err("E_SCHEMA", path, f"MU v1.1 schema validation failed: {e.message}"))
+            errors.append(err("E_SCHEMA", path, f"MU v{sv} schema validation failed: {e.message}"))
         except Exception as e:
-            errors.append(err("E_SCHEMA", path, f"MU v1.1 schema validation failed: {e}"))
+            errors.append(err("E_SCHEMA", path, f"MU v{sv} schema validation failed: {e}"))
 
     if "meta" in data and not isinstance(data["meta"], dict):
         errors.append(err("E_TYPE", path, "meta must be dict"))
@@ -91,9 +150,10 @@ def validate_file(path: str) -> tuple[list[dict], list[dict]]:
 
     meta = data.get("meta", {}) if isinstance(data.get("meta", {}), dict) else {}
 
-    for k in REQUIRED_META:
-        if k not in meta:
-            errors.append(err("E_REQUIRED", path, f"Missing meta: {k}"))
+    if not _REQUIRED_META <= meta.keys():
+        for k in REQUIRED_META:
+            if k not in meta:
+                errors.append(err("E_REQUIRED", path, f"Missing meta: {k}"))
 
     # allow meta.source to be string (preferred). if dict, keep legacy tolerance.
     src = meta.get("source")
@@ -106,8 +166,8 @@ def validate_file(path: str) -> tuple[list[dict], list[dict]]:
     if meta.get("has_struct_data") is True and "struct_data" not in data:
         warnings.append(err("W_STRUCT", path, "has_struct_data=true but struct_data missing"))
 
-    if sv and str(sv) not in {"1.0", "1.1"}:
-        warnings.append(err("W_SCHEMA", path, f"schema_version={sv} (expected 1.0 or 1.1)"))
+    if sv and str(sv) not in {"1.0", "1.1", "1.2"}:
+        warnings.append(err("W_SCHEMA", path, f"schema_version={sv} (expected 1.0, 1.1 or 1.2)"))
 
     # snapshot minimal contract
     snap = data.get("snapshot")
@@ -116,7 +176,7 @@ def validate_file(path: str) -> tuple[list[dict], list[dict]]:
         codec = snap.get("codec")
         if kind not in {"text", "web", "audio", "image", "other"}:
             errors.append(err("E_SNAPSHOT", path, f"snapshot.kind invalid: {kind}"))
-        if codec not in {"plain", "gz+b64"}:
+        if codec not in {"plain", *B64_CODECS}:
             errors.append(err("E_SNAPSHOT", path, f"snapshot.codec invalid: {codec}"))
 
         src_ref = snap.get("source_ref")
@@ -136,20 +196,21 @@ def validate_file(path: str) -> tuple[list[dict], list[dict]]:
                             "snapshot.payload.text required for codec=plain",
                         )
                     )
-            if codec == "gz+b64":
-                b64 = payload.get("text_gz_b64")
+            if codec in B64_CODECS:
+                field = B64_CODECS[codec]
+                b64 = payload.get(field)
                 if not isinstance(b64, str):
                     errors.append(
                         err(
                             "E_SNAPSHOT",
                             path,
-                            "snapshot.payload.text_gz_b64 required for codec=gz+b64",
+                            f"snapshot.payload.{field} required for codec={codec}",
                         )
                     )
                 else:
                     try:
-                        raw = gzip.decompress(base64.b64decode(b64.encode("utf-8")))
-                        if len(raw) > 20_000:
+                        size = payload_size(codec, b64) if decode_payloads else peek_b64_payload(codec, b64)
+                        if size is not None and size > 20_000:
                             warnings.append(
                                 err(
                                     "W_SNAPSHOT",
@@ -157,6 +218,8 @@ def validate_file(path: str) -> tuple[list[dict], list[dict]]:
                                     "snapshot text > 20KB; consider splitting MU",
                                 )
                             )
+                    except RuntimeError as e:
+                        errors.append(err("E_SNAPSHOT", path, f"snapshot.payload not decodable: {e}"))
                     except Exception:
                         errors.append(err("E_SNAPSHOT", path, "snapshot.payload not decodable"))
 
@@ -222,16 +285,129 @@ def validate_file(path: str) -> tuple[list[dict], list[dict]]:
     return errors, warnings
 
 
+@lru_cache(maxsize=2)
+def rules_fingerprint(decode_payloads: bool = True) -> str:
+    """Identifies the rules a cached result was produced under.
+
+    Covers this module, the payload codecs, the YAML loader (and whether it
+    runs on libyaml), the MU schemas, the PyYAML and jsonschema versions,
+    whether the optional zstd decoder is present and the payload check mode;
+    any change invalidates the whole cache.
+    """
+    h = sha256_new(b"decode" if decode_payloads else b"peek")
+    for p in (Path(__file__), Path(payload_codec.__file__), Path(yaml_compat.__file__), *MU_SCHEMAS.values()):
+        h.update(p.read_bytes())
+    h.update(b"zstd" if payload_codec.zstandard is not None else b"")
+    h.update(b"libyaml" if yaml_compat.HAVE_LIBYAML else b"")
+    for dist in ("PyYAML", "jsonschema"):
+        try:
+            version = metadata.version(dist)
+        except metadata.PackageNotFoundError:
+            version = ""
+        h.update(f"\0{dist}={version}".encode("utf-8"))
+    return h.hexdigest()
+
+
+def load_cache(cache_dir: Path, decode_payloads: bool = True) -> dict:
+    """Cached results by absolute path: {mtime_ns, size, errors, warnings}."""
+    try:
+        doc = json.loads((cache_dir / CACHE_FILE).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(doc, dict) or doc.get("rules") != rules_fingerprint(decode_payloads):
+        return {}
+    entries = doc.get("entries")
+    return entries if isinstance(entries, dict) else {}
+
+
+def save_cache(cache_dir: Path, entries: dict, decode_payloads: bool = True) -> None:
+    # entries are kept in least- to most-recently-used order; drop the oldest
+    if len(entries) > CACHE_MAX_ENTRIES:
+        entries = dict(list(entries.items())[-CACHE_MAX_ENTRIES:])
+    doc = {"rules": rules_fingerprint(decode_payloads), "entries": entries}
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp = cache_dir / f"{CACHE_FILE}.{os.getpid()}.tmp"
+        tmp.write_text(json.dumps(doc, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, cache_dir / CACHE_FILE)
+    except OSError:
+        # cache is best-effort; never fail validation because of it
+        pass
+
+
+def validate_many(
+    paths: list[Path], jobs: int = 1, decode_payloads: bool = True
+) -> list[tuple[list[dict], list[dict]]]:
+    """validate_file() over many files, preserving input order.
+
+    The checks are CPU-bound Python (YAML construction, jsonschema), so the
+    parallel path uses processes; chunksize amortizes the pickling of the
+    small per-file results.
+    """
+
+    check = partial(validate_file, decode_payloads=decode_payloads)
+    if jobs <= 1 or len(paths) < 2:
+        return [check(str(p)) for p in paths]
+    with ProcessPoolExecutor(max_workers=jobs) as ex:
+        return list(ex.map(check, [str(p) for p in paths], chunksize=64))
+
+
+def validate_many_cached(
+    paths: list[Path], cache: dict, jobs: int = 1, decode_payloads: bool = True
+) -> list[tuple[list[dict], list[dict]]]:
+    """validate_many(), reusing results in `cache` while mtime and size match."""
+
+    results: list = [None] * len(paths)
+    stale: list[tuple[int, str, os.stat_result | None]] = []
+    for i, p in enumerate(paths):
+        key = os.path.abspath(p)
+        try:
+            st = p.stat()  # before validating: a concurrent rewrite just misses next run
+        except OSError:
+            # vanished or unreadable: let validate_file report it, and don't cache that
+            cache.pop(key, None)
+            stale.append((i, key, None))
+            continue
+        entry = cache.pop(key, None)
+        if isinstance(entry, dict) and entry.get("mtime_ns") == st.st_mtime_ns and entry.get("size") == st.st_size:
+            cache[key] = entry  # reinsert as most recently used
+            results[i] = (entry["errors"], entry["warnings"])
+        else:
+            stale.append((i, key, st))
+
+    fresh = validate_many([paths[i] for i, _, _ in stale], jobs, decode_payloads)
+    for (i, key, st), (errors, warnings) in zip(stale, fresh):
+        if st is not None:
+            cache[key] = {"mtime_ns": st.st_mtime_ns, "size": st.st_size, "errors": errors, "warnings": warnings}
+        results[i] = (errors, warnings)
+    return results
+
+
 def iter_mimo_files(in_path: Path) -> list[Path]:
     if in_path.is_file() and in_path.suffix.lower() == ".mimo":
         return [in_path]
-    files = [p for p in in_path.rglob("*.mimo") if p.is_file()]
-    return sorted(files)
+    return iter_files(in_path, {".mimo"})
 
 
 def main(argv: list[str] | None = None) -> int:
     ap = argparse.ArgumentParser(prog="mimo-validate")
     ap.add_argument("--in", dest="in_path", required=True, help="Input .mimo file or directory")
+    ap.add_argument(
+        "--cache-dir",
+        default=None,
+        help="Reuse results for .mimo files unchanged since the last run (off by default)",
+    )
+    ap.add_argument(
+        "--jobs",
+        type=int,
+        default=default_jobs(),
+        help="Parallel worker processes for validation (default: usable CPUs)",
+    )
+    ap.add_argument(
+        "--quick-snapshot",
+        action="store_true",
+        help="Check snapshot payload framing only instead of fully decoding it",
+    )
     ns = ap.parse_args(argv)
 
     in_path = Path(ns.in_path)
@@ -243,16 +419,32 @@ def main(argv: list[str] | None = None) -> int:
     checked = 0
     failed = 0
     warn_count = 0
-
-    for p in files:
+    cache_dir = Path(ns.cache_dir) if ns.cache_dir else None
+    decode_payloads = not ns.quick_snapshot
+    cache = load_cache(cache_dir, decode_payloads) if cache_dir is not None else None
+
+    if cache is None:
+        results = validate_many(files, ns.jobs, decode_payloads)
+    else:
+        results = validate_many_cached(files, cache, ns.jobs, decode_payloads)
+
+    # printed from the main process, in walk order, one write per batch of files
+    out: list[str] = []
+    for p, (errs, warns) in zip(files, results):
         checked += 1
-        errs, warns = validate_file(str(p))
         for w in warns:
             warn_count += 1
-            print(f"WARN: {p}\n  - {w['code']}: {w['msg']}")
+            out.append(f"WARN: {p}\n  - {w['code']}: {w['msg']}\n")
         for e in errs:
             failed += 1
-            print(f"ERROR: {p}\n  - {e['code']}: {e['msg']}")
+            out.append(f"ERROR: {p}\n  - {e['code']}: {e['msg']}\n")
+        if checked % _PRINT_BATCH == 0 and out:
+            sys.stdout.write("".join(out))
+            out.clear()
+    sys.stdout.write("".join(out))
+
+    if cache is not None:
+        save_cache(cache_dir, cache, decode_payloads)
 
     print(f"checked={checked} failed={failed} warnings={warn_count}")
     return 0 if failed == 0 else 2
@@ -1,17 +1,71 @@
 import hashlib
 import json
 
+try:
+    import orjson  # optional: C-accelerated JSON (see _orjson_safe for when it is used)
+except ImportError:
+    orjson = None
+
+
+def sha256_new(data: bytes = b""):
+    # These digests are content identifiers, not security primitives; on FIPS
+    # OpenSSL builds this lifts the restriction to the validated implementation.
+    return hashlib.sha256(data, usedforsecurity=False)
+
 
 def sha256_hex(data: bytes) -> str:
-    h = hashlib.sha256()
-    h.update(data)
-    return h.hexdigest()
+    return sha256_new(data).hexdigest()
 
 
 def sha256_prefixed(data: bytes) -> str:
     return "sha256:" + sha256_hex(data)
 
 
+def _orjson_safe(obj) -> bool:
+    """True if orjson serializes `obj` byte-identically to the stdlib encoder.
+
+    That holds for str keys and str/int/bool/None/list/tuple/dict values, with
+    ints in orjson's 64-bit range. Floats are excluded: the two differ in repr
+    (1e16 vs 1e+16, 1e-07 vs 1e-7) and in NaN/Infinity handling.
+    """
+
+    t = type(obj)
+    if t is str or t is bool or obj is None:
+        return True
+    if t is int:
+        return -(2**63) <= obj < 2**64
+    if t is list or t is tuple:
+        return all(_orjson_safe(v) for v in obj)
+    if t is dict:
+        return all(type(k) is str and _orjson_safe(v) for k, v in obj.items())
+    return False
+
+
+def _orjson_dumps(obj) -> bytes | None:
+    if orjson is None or not _orjson_safe(obj):
+        return None
+    try:
+        return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS)
+    except orjson.JSONEncodeError:  # e.g. lone surrogates; leave it to the stdlib
+        return None
+
+
 def canonical_json(obj) -> str:
-    # stable json for hashing
+    # stable json for hashing; the stdlib encoder is the reference output
+    out = _orjson_dumps(obj)
+    if out is not None:
+        return out.decode("utf-8")
     return json.dumps(obj, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+
+
+def canonical_json_bytes(obj) -> bytes:
+    # canonical_json(obj).encode("utf-8"), without the str round trip under orjson
+    out = _orjson_dumps(obj)
+    if out is not None:
+        return out
+    return canonical_json(obj).encode("utf-8")
+
+
+def sha256_canonical(obj) -> str:
+    # sha256_hex(canonical_json(obj).encode("utf-8")), hashing the bytes directly
+    return sha256_new(canonical_json_bytes(obj)).hexdigest()
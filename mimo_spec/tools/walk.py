@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+import os
+from collections.abc import Iterable
+from pathlib import Path
+
+
+def _dir_key(p) -> str:
+    return os.path.normcase(os.path.abspath(p))
+
+
+def iter_files(root: Path, suffixes: set[str], skip_dirs: Iterable[Path] = ()) -> list[Path]:
+    """Recursively list files under `root` whose lower-cased suffix is in `suffixes`.
+
+    Uses os.scandir so file/dir checks come from the directory read instead of
+    one stat per entry. Symlinked directories are not followed, and directories
+    in `skip_dirs` are pruned without being read. Sorted.
+    """
+
+    skip = {_dir_key(d) for d in skip_dirs}
+    found: list[Path] = []
+    stack = [os.fspath(root)]
+    while stack:
+        try:
+            it = os.scandir(stack.pop())
+        except OSError:
+            continue
+        with it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    if not skip or _dir_key(entry.path) not in skip:
+                        stack.append(entry.path)
+                elif os.path.splitext(entry.name)[1].lower() in suffixes and entry.is_file():
+                    found.append(Path(entry.path))
+    found.sort()
+    return found
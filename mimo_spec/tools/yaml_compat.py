@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+"""Shared PyYAML loader/dumper selection for the mimo tools.
+
+Prefer the libyaml-backed C classes and fall back to the pure-Python ones when
+PyYAML was built without libyaml. Output and safety guarantees are the same.
+"""
+
+import yaml
+
+try:
+    from yaml import CSafeDumper as SafeDumper
+    from yaml import CSafeLoader as SafeLoader
+
+    HAVE_LIBYAML = True
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeDumper, SafeLoader
+
+    HAVE_LIBYAML = False
+
+
+def load(stream):
+    return yaml.load(stream, Loader=SafeLoader)
+
+
+def load_bytes(data: bytes):
+    """Parse an undecoded document; libyaml does the UTF-8 decoding itself.
+
+    Input that is not valid UTF-8 falls back to the tolerant decode the tools
+    have always applied (invalid bytes dropped) rather than failing.
+    """
+    try:
+        return load(data)
+    except yaml.reader.ReaderError:
+        return load(data.decode("utf-8", errors="ignore"))
@@ -0,0 +1,48 @@
+import copy
+
+import pytest
+
+
+def _build_base_mu():
+    # A minimal MU v1.1 that passes validate_file with no errors.
+    return {
+        "schema_version": "1.1",
+        "mu_id": "mu_test",
+        "content_hash": "sha256:" + "0" * 64,
+        "idempotency": {"mu_key": "sha256:" + "0" * 64},
+        "meta": {
+            "time": "2026-02-21T00:00:00Z",
+            "source": "test",
+            "group_id": "g",
+            "order": "1/1",
+            "span": "1-1",
+            "shared_assets": [],
+            "has_assets": False,
+            "has_struct_data": False,
+        },
+        "summary": "hi",
+        "pointer": [{"type": "file", "path": __file__, "timestamp": "2026-02-21T00:00:00Z"}],
+        "snapshot": {
+            "kind": "text",
+            "codec": "gz+b64",
+            "size_bytes": 2,
+            "created_at": "2026-02-21T00:00:00Z",
+            "source_ref": {"uri": "file://" + __file__, "sha256": "sha256:" + "0" * 64},
+            "payload": {"text_gz_b64": "H4sIAAAAAAAC/8vIBACsKpPYAgAAAA=="},
+            "meta": {},
+        },
+        "links": {"corrects": [], "supersedes": [], "duplicate_of": []},
+        "privacy": {"level": "private", "redact": "none", "pii": [], "share_policy": {"allow_snapshot": True, "allow_pointer": True}},
+        "provenance": {"tool": "test", "tool_version": "0"},
+    }
+
+
+@pytest.fixture(scope="session")
+def base_mu_template():
+    return _build_base_mu()
+
+
+@pytest.fixture
+def base_mu(base_mu_template):
+    # fresh copy per test: tests mutate it freely
+    return copy.deepcopy(base_mu_template)
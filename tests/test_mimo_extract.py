@@ -0,0 +1,133 @@
+import datetime
+import sys
+from pathlib import Path
+
+import yaml
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from mimo_spec.tools import mimo_extract
+
+
+def _write(tmp_path, obj, name="x.mimo"):
+    p = tmp_path / name
+    p.write_text(yaml.safe_dump(obj, allow_unicode=True, sort_keys=False), encoding="utf-8")
+    return p
+
+
+def test_load_mimo_cache_roundtrip(tmp_path):
+    cache_dir = tmp_path / ".mimo_cache"
+    p = _write(tmp_path, {"summary": "hi", "meta": {"group_id": "g"}})
+
+    first = mimo_extract.load_mimo(p, cache_dir)
+    assert first["summary"] == "hi"
+    assert len(list(cache_dir.glob("*.json"))) == 1
+
+    # cache hit returns the same document
+    assert mimo_extract.load_mimo(p, cache_dir) == first
+
+    # documents JSON can't represent exactly (here: a YAML date) are not cached
+    d = _write(tmp_path, {"summary": "dated", "meta": {"time": datetime.date(2026, 2, 21)}}, name="d.mimo")
+    assert mimo_extract.load_mimo(d, cache_dir)["meta"]["time"] == datetime.date(2026, 2, 21)
+    assert len(list(cache_dir.glob("*.json"))) == 1
+
+    # rewriting the file invalidates the entry
+    p.write_text(yaml.safe_dump({"summary": "changed!"}), encoding="utf-8")
+    assert mimo_extract.load_mimo(p, cache_dir)["summary"] == "changed!"
+
+
+def test_load_mimo_many_preserves_order(tmp_path):
+    paths = [_write(tmp_path, {"summary": str(i)}, name=f"{i:02d}.mimo") for i in range(20)]
+    docs = mimo_extract.load_mimo_many(paths, jobs=4)
+    assert [d["summary"] for d in docs] == [str(i) for i in range(20)]
+
+
+def test_extract_reconstructs_snapshot(tmp_path):
+    from mimo_spec.tools import mimo_pack
+
+    raw = tmp_path / "raw"
+    raw.mkdir()
+    lines = [f"line {i}" for i in range(1, 8)]
+    (raw / "doc.txt").write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    mu_dir = tmp_path / "mu"
+    out = tmp_path / "out"
+    assert mimo_pack.main(["--in", str(raw), "--out", str(mu_dir), "--split", "line_window:3"]) == 0
+    assert mimo_extract.main(["--in", str(mu_dir), "--out", str(out)]) == 0
+    (group_dir,) = [p for p in out.iterdir() if p.is_dir()]
+    assert not (group_dir / "snapshot.txt").exists()  # opt-in
+
+    assert mimo_extract.main(["--in", str(mu_dir), "--out", str(out), "--snapshot-text"]) == 0
+    assert (group_dir / "snapshot.txt").read_text(encoding="utf-8") == "\n".join(lines)
+    assert (group_dir / "summary.txt").read_text(encoding="utf-8") == "line 1 line 2 line 3\n\nline 4 line 5 line 6\n\nline 7"
+
+
+def test_copy_snapshot_rolls_back_partial_text():
+    import base64
+    import io
+
+    from mimo_spec.tools.codec import gz_compress
+
+    good = {"codec": "gz+b64", "payload": {"text_gz_b64": base64.b64encode(gz_compress(b"ok")).decode("ascii")}}
+    # decodes ~1MB before the truncated stream is noticed
+    cut = gz_compress(bytes(range(256)) * 4096)[:-8]
+    bad = {"codec": "gz+b64", "payload": {"text_gz_b64": base64.b64encode(cut).decode("ascii")}}
+
+    sink = io.BytesIO()
+    assert mimo_extract.copy_snapshot(good, sink)
+    assert not mimo_extract.copy_snapshot(bad, sink, b"\n")
+    assert mimo_extract.copy_snapshot(good, sink, b"\n")
+    assert sink.getvalue() == b"ok\nok"
+
+    # same for a truncated zstd frame (or a missing zstandard)
+    cut_zstd = {"codec": "zstd+b64", "payload": {"text_zstd_b64": "KLUv/SACEQAA"}}
+    assert not mimo_extract.copy_snapshot(cut_zstd, sink, b"\n")
+    assert sink.getvalue() == b"ok\nok"
+
+
+def test_write_json_matches_stdlib(tmp_path):
+    import json
+
+    # YAML can produce int keys, big ints and floats; output must not depend on orjson
+    for obj in ([{"locator": {"kind": "page_range", 1: 2}}], {"big": 2**70, "f": [1e16, 1e-07]}, {"s": "é", "l": []}):
+        out = tmp_path / "x.json"
+        mimo_extract.write_json(out, obj)
+        assert out.read_text(encoding="utf-8") == json.dumps(obj, ensure_ascii=False, indent=2)
+
+    # end to end: a pointer locator with an int key no longer aborts the run
+    mu_dir = tmp_path / "mu"
+    mu_dir.mkdir()
+    _write(mu_dir, {"summary": "s", "meta": {"group_id": "g"}, "pointer": [{"locator": {"kind": "page_range", 1: 2}}]})
+    assert mimo_extract.main(["--in", str(mu_dir), "--out", str(tmp_path / "out"), "--jobs", "1"]) == 0
+    assert json.loads((tmp_path / "out" / "g" / "pointers.json").read_text(encoding="utf-8")) == [
+        {"locator": {"kind": "page_range", "1": 2}}
+    ]
+
+
+def test_resolve_pointer_snippet_line_range(tmp_path):
+    src = tmp_path / "src.txt"
+    src.write_bytes(b"one\r\ntwo\nthree\nfour\n")
+
+    def snippet(start, end):
+        return mimo_extract.resolve_pointer_snippet(
+            {"path": str(src), "locator": {"kind": "line_range", "start": start, "end": end}}
+        )
+
+    assert snippet(1, 2) == "one\ntwo\n"
+    assert snippet(3, 99) == "three\nfour\n"
+    assert snippet(9, 9) == ""
+    assert snippet(2, 1) is None
+
+    # a lone CR ends a line too (mimo-pack's locators count it)
+    src.write_bytes(b"a\rb\rc\n")
+    mimo_extract._line_index.cache_clear()
+    assert snippet(1, 1) == "a\n"
+    assert snippet(2, 2) == "b\n"
+    assert snippet(2, 3) == "b\nc\n"
+
+    missing = {"path": str(tmp_path / "nope.txt"), "locator": {"kind": "line_range", "start": 1, "end": 1}}
+    assert mimo_extract.resolve_pointer_snippet(missing) is None
+    nul = {"path": "bad\0name.txt", "locator": {"kind": "line_range", "start": 1, "end": 1}}
+    assert mimo_extract.resolve_pointer_snippet(nul) is None
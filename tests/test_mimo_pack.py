@@ -0,0 +1,77 @@
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from mimo_spec.tools import mimo_pack
+
+
+def _old_windows(text, window):
+    lines = text.splitlines()
+    total = max(1, (len(lines) + window - 1) // window)
+    return [
+        "\n".join(lines[i * window : min(len(lines), (i + 1) * window)]).strip()
+        for i in range(total)
+    ]
+
+
+def test_window_bounds_matches_splitlines():
+    cases = ["", "a", "a\n", "a\n\n", "a\r\nb\rc\x0cd\n", "1\n2\n3\n4\n", "\n\n\nx"]
+    for text in cases:
+        for window in (1, 2, 3):
+            norm = mimo_pack.normalize_newlines(text)
+            n_lines, bounds = mimo_pack.window_bounds(norm, window)
+            assert n_lines == len(text.splitlines())
+            got = [norm[bounds[i] : bounds[i + 1]].strip() for i in range(len(bounds) - 1)]
+            assert got == _old_windows(text, window), (text, window)
+
+
+def test_main_dedup_skips_existing_mus(tmp_path, capsys):
+    raw = tmp_path / "raw"
+    raw.mkdir()
+    (raw / "a.txt").write_text("1\n2\n3\n", encoding="utf-8")
+    out = tmp_path / "out"
+    args = ["--in", str(raw), "--out", str(out), "--split", "line_window:2"]
+
+    assert mimo_pack.main(args) == 0
+    assert "written_mus=2" in capsys.readouterr().out
+    assert len(mimo_pack.load_existing_mu_keys(out)) == 2
+
+    assert mimo_pack.main(args) == 0
+    assert "written_mus=0" in capsys.readouterr().out
+
+
+def test_main_parallel_dedup_is_order_stable(tmp_path, capsys):
+    raw = tmp_path / "raw"
+    raw.mkdir()
+    for name in ("a.md", "b.txt", "c.txt"):
+        (raw / name).write_text("same\ncontent\n", encoding="utf-8")
+    out = tmp_path / "out"
+
+    assert mimo_pack.main(["--in", str(raw), "--out", str(out), "--split", "line_window:1", "--jobs", "4"]) == 0
+    assert "written_mus=2" in capsys.readouterr().out
+    # identical content dedups to the first file in sorted order
+    for p in out.glob("*.mimo"):
+        assert ".md\n" in p.read_text(encoding="utf-8")
+
+
+def test_main_skips_out_dir_nested_in_input(tmp_path, capsys):
+    raw = tmp_path / "raw"
+    out = raw / "mu_out"
+    out.mkdir(parents=True)
+    (raw / "a.txt").write_text("1\n", encoding="utf-8")
+    (out / "stray.txt").write_text("2\n", encoding="utf-8")
+
+    assert mimo_pack.main(["--in", str(raw), "--out", str(out), "--split", "line_window:1"]) == 0
+    assert "written_mus=1" in capsys.readouterr().out
+
+
+def test_gz_b64_is_reproducible():
+    import base64
+    import gzip
+
+    enc = mimo_pack.gz_b64("héllo\n" * 100)
+    assert enc == mimo_pack.gz_b64("héllo\n" * 100)
+    assert gzip.decompress(base64.b64decode(enc)).decode("utf-8") == "héllo\n" * 100
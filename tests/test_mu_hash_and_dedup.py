@@ -1,13 +1,14 @@
 import sys
 from pathlib import Path
 
+import pytest
 import yaml
 
 ROOT = Path(__file__).resolve().parents[1]
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
-from mimo_spec.tools.mu_hash import canonical_json, sha256_prefixed
+from mimo_spec.tools.mu_hash import canonical_json, sha256_canonical, sha256_hex, sha256_prefixed
 from mimo_spec.tools import mimo_pack
 
 
@@ -54,3 +55,62 @@ def test_dedup_skip(tmp_path):
     ok2 = mimo_pack.write_mu_v1_1(str(p2), meta=meta, pointer=pointer, summary="hi", snapshot_text="hi", dedup="skip", existing_mu_keys={mu_key})
     assert ok2 is False
     assert not p2.exists()
+
+
+def test_write_mu_v1_1_precomputed_raw_sha(tmp_path, monkeypatch):
+    meta = {"group_id": "g"}
+    pointer = {"type": "file", "path": __file__, "timestamp": "2026-02-21T00:00:00Z"}
+    hex_digest = sha256_hex(Path(__file__).read_bytes())
+
+    p1 = tmp_path / "read.mimo"
+    mimo_pack.write_mu_v1_1(str(p1), meta=meta, pointer=pointer, summary="hi", snapshot_text="hi")
+    read = yaml.safe_load(p1.read_text(encoding="utf-8"))
+
+    # the precomputed digest (bare or prefixed) skips the re-read and yields the same hashes
+    monkeypatch.setattr(mimo_pack, "sha256_file_hex", lambda p: pytest.fail("re-read pointer.path"))
+    for given in (hex_digest, "sha256:" + hex_digest):
+        p2 = tmp_path / "given.mimo"
+        mimo_pack.write_mu_v1_1(str(p2), meta=meta, pointer=pointer, summary="hi", snapshot_text="hi", raw_sha256_hex=given)
+        data = yaml.safe_load(p2.read_text(encoding="utf-8"))
+        assert data["snapshot"]["source_ref"]["sha256"] == "sha256:" + hex_digest
+        assert data["idempotency"] == read["idempotency"]
+
+    with pytest.raises(ValueError):
+        mimo_pack.write_mu_v1_1(str(tmp_path / "x.mimo"), meta=meta, pointer={}, summary="hi", snapshot_text="hi", raw_sha256_hex=hex_digest)
+
+
+def test_canonical_json_matches_contract():
+    # id_dedup_v0_1: UTF-8, sort_keys, no whitespace (regardless of JSON backend)
+    import json
+
+    obj = {"split": {"window": 400, "index": 0}, "raw_sha256": "sha256:" + "0" * 64, "s": "é \x00"}
+    assert canonical_json(obj) == json.dumps(obj, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    assert sha256_canonical(obj) == sha256_hex(canonical_json(obj).encode("utf-8"))
+
+    # floats, big ints and NaN must not change bytes with the backend either
+    for obj in ({"f": [1e16, 1e-07, 0.1, -0.0, 2.5]}, {"n": float("nan")}, {"big": 2**70, "neg": -(2**64)}):
+        expected = json.dumps(obj, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+        assert canonical_json(obj) == expected
+        assert sha256_canonical(obj) == sha256_hex(expected.encode("utf-8"))
+
+
+def test_mu_key_matches_canonical_seed():
+    raw = "sha256:" + "ab" * 32
+    key_of = mimo_pack.line_window_mu_keys(raw_sha256=raw, split_spec=mimo_pack.SplitSpec("line_window", 400), total=3)
+    for i in range(3):
+        locator = {"kind": "line_range", "start": i * 400 + 1, "end": (i + 1) * 400}
+        split = {"strategy": "line_window", "index": i, "total": 3, "window": 400}
+        expected = sha256_prefixed(canonical_json({"raw_sha256": raw, "locator": locator, "split": split}).encode("utf-8"))
+        assert mimo_pack.compute_mu_key(raw_sha256=raw, locator=locator, split=split) == expected
+        assert key_of(i, locator["start"], locator["end"]) == expected
+
+
+def test_content_hash_matches_canonical_seed():
+    snap = {"kind": "text", "codec": "gz+b64", "payload": {"text_gz_b64": "H4sI"}, "created_at": "x"}
+    seed = {
+        "schema_version": "1.1",
+        "summary": "héllo",
+        "snapshot": {"kind": "text", "codec": "gz+b64", "payload": {"text_gz_b64": "H4sI"}},
+    }
+    expected = sha256_prefixed(canonical_json(seed).encode("utf-8"))
+    assert mimo_pack.compute_content_hash(schema_version="1.1", summary="héllo", snapshot=snap) == expected
@@ -17,85 +17,33 @@ def _write(tmp_path, obj):
     return str(p)
 
 
-def test_pointer_new_style_ok(tmp_path):
-    mimo = {
-        "schema_version": "1.1",
-        "mu_id": "mu_test",
-        "content_hash": "sha256:" + "0" * 64,
-        "idempotency": {"mu_key": "sha256:" + "0" * 64},
-        "meta": {
-            "time": "2026-02-21T00:00:00Z",
-            "source": "test",
-            "group_id": "g",
-            "order": "1/1",
-            "span": "1-1",
-            "has_assets": False,
-            "has_struct_data": False,
-        },
-        "summary": "hi",
-        "links": {"corrects": [], "supersedes": [], "duplicate_of": []},
-        "privacy": {"level": "private", "redact": "none", "pii": [], "share_policy": {"allow_snapshot": True, "allow_pointer": True}},
-        "provenance": {"tool": "test", "tool_version": "0"},
-        "pointer": [
-            {
-                "type": "raw",
-                "uri": "vault://default/raw/2026/02/21/a.txt",
-                "sha256": "sha256:" + "0" * 64,
-                "locator": {"kind": "line_range", "start": 1, "end": 2},
-            }
-        ],
-        "snapshot": {
-            "kind": "text",
-            "codec": "gz+b64",
-            "size_bytes": 2,
-            "created_at": "2026-02-21T00:00:00Z",
-            "source_ref": {"uri": "vault://default/raw/2026/02/21/a.txt", "sha256": "sha256:" + "0" * 64},
-            "payload": {"text_gz_b64": "H4sIAAAAAAAC/8vIBACsKpPYAgAAAA=="},
-            "meta": {},
-        },
-    }
+def test_pointer_new_style_ok(tmp_path, base_mu):
+    mimo = base_mu
+    mimo["pointer"] = [
+        {
+            "type": "raw",
+            "uri": "vault://default/raw/2026/02/21/a.txt",
+            "sha256": "sha256:" + "0" * 64,
+            "locator": {"kind": "line_range", "start": 1, "end": 2},
+        }
+    ]
+    mimo["snapshot"]["source_ref"] = {"uri": "vault://default/raw/2026/02/21/a.txt", "sha256": "sha256:" + "0" * 64}
     path = _write(tmp_path, mimo)
     errors, warnings = validate_file(path)
     assert errors == []
 
 
-def test_pointer_new_style_bad_locator(tmp_path):
-    mimo = {
-        "schema_version": "1.1",
-        "mu_id": "mu_test",
-        "content_hash": "sha256:" + "0" * 64,
-        "idempotency": {"mu_key": "sha256:" + "0" * 64},
-        "meta": {
-            "time": "2026-02-21T00:00:00Z",
-            "source": "test",
-            "group_id": "g",
-            "order": "1/1",
-            "span": "1-1",
-            "has_assets": False,
-            "has_struct_data": False,
-        },
-        "summary": "hi",
-        "links": {"corrects": [], "supersedes": [], "duplicate_of": []},
-        "privacy": {"level": "private", "redact": "none", "pii": [], "share_policy": {"allow_snapshot": True, "allow_pointer": True}},
-        "provenance": {"tool": "test", "tool_version": "0"},
-        "pointer": [
-            {
-                "type": "raw",
-                "uri": "vault://default/raw/2026/02/21/a.txt",
-                "sha256": "sha256:" + "0" * 64,
-                "locator": {"kind": "line_range", "start": 3, "end": 2},
-            }
-        ],
-        "snapshot": {
-            "kind": "text",
-            "codec": "gz+b64",
-            "size_bytes": 2,
-            "created_at": "2026-02-21T00:00:00Z",
-            "source_ref": {"uri": "vault://default/raw/2026/02/21/a.txt", "sha256": "sha256:" + "0" * 64},
-            "payload": {"text_gz_b64": "H4sIAAAAAAAC/8vIBACsKpPYAgAAAA=="},
-            "meta": {},
-        },
-    }
+def test_pointer_new_style_bad_locator(tmp_path, base_mu):
+    mimo = base_mu
+    mimo["pointer"] = [
+        {
+            "type": "raw",
+            "uri": "vault://default/raw/2026/02/21/a.txt",
+            "sha256": "sha256:" + "0" * 64,
+            "locator": {"kind": "line_range", "start": 3, "end": 2},
+        }
+    ]
+    mimo["snapshot"]["source_ref"] = {"uri": "vault://default/raw/2026/02/21/a.txt", "sha256": "sha256:" + "0" * 64}
     path = _write(tmp_path, mimo)
     errors, warnings = validate_file(path)
     assert any(e["code"] == "E_LOCATOR" for e in errors)
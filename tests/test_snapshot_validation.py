@@ -1,12 +1,15 @@
+import base64
 import sys
 from pathlib import Path
 
+import pytest
 import yaml
 
 ROOT = Path(__file__).resolve().parents[1]
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
+from mimo_spec.tools import mimo_validate
 from mimo_spec.tools.mimo_validate import validate_file
 
 
@@ -16,69 +19,149 @@ def _write(tmp_path, obj):
     return str(p)
 
 
-def test_snapshot_gzb64_ok(tmp_path):
-    mimo = {
-        "schema_version": "1.1",
-        "mu_id": "mu_test",
-        "content_hash": "sha256:" + "0" * 64,
-        "idempotency": {"mu_key": "sha256:" + "0" * 64},
-        "meta": {
-            "time": "2026-02-21T00:00:00Z",
-            "source": "test",
-            "group_id": "g",
-            "order": "1/1",
-            "span": "1-1",
-            "has_assets": False,
-            "has_struct_data": False,
-        },
-        "summary": "hi",
-        "links": {"corrects": [], "supersedes": [], "duplicate_of": []},
-        "privacy": {"level": "private", "redact": "none", "pii": [], "share_policy": {"allow_snapshot": True, "allow_pointer": True}},
-        "provenance": {"tool": "test", "tool_version": "0"},
-        "pointer": [{"type": "file", "path": __file__, "timestamp": "2026-02-21T00:00:00Z"}],
-        "snapshot": {
-            "kind": "text",
-            "codec": "gz+b64",
-            "size_bytes": 2,
-            "created_at": "2026-02-21T00:00:00Z",
-            "source_ref": {"uri": "file://" + __file__, "sha256": "sha256:" + "0" * 64},
-            "payload": {"text_gz_b64": "H4sIAAAAAAAC/8vIBACsKpPYAgAAAA=="},
-            "meta": {},
-        },
-    }
+def test_snapshot_gzb64_ok(tmp_path, base_mu):
+    mimo = base_mu
     path = _write(tmp_path, mimo)
     errors, warnings = validate_file(path)
     assert errors == []
 
 
-def test_snapshot_missing_source_ref(tmp_path):
-    mimo = {
-        "schema_version": "1.1",
-        "mu_id": "mu_test",
-        "content_hash": "sha256:" + "0" * 64,
-        "idempotency": {"mu_key": "sha256:" + "0" * 64},
-        "meta": {
-            "time": "2026-02-21T00:00:00Z",
-            "source": "test",
-            "group_id": "g",
-            "order": "1/1",
-            "span": "1-1",
-            "has_assets": False,
-            "has_struct_data": False,
-        },
-        "summary": "hi",
-        "links": {"corrects": [], "supersedes": [], "duplicate_of": []},
-        "privacy": {"level": "private", "redact": "none", "pii": [], "share_policy": {"allow_snapshot": True, "allow_pointer": True}},
-        "provenance": {"tool": "test", "tool_version": "0"},
-        "pointer": [{"type": "file", "path": __file__, "timestamp": "2026-02-21T00:00:00Z"}],
-        "snapshot": {
-            "kind": "text",
-            "codec": "gz+b64",
-            "size_bytes": 2,
-            "created_at": "2026-02-21T00:00:00Z",
-            "payload": {"text_gz_b64": "H4sIAAAAAAAC/8vIBACsKpPYAgAAAA=="},
-        },
-    }
+def test_snapshot_missing_source_ref(tmp_path, base_mu):
+    mimo = base_mu
+    del mimo["snapshot"]["source_ref"]
+    del mimo["snapshot"]["meta"]
     path = _write(tmp_path, mimo)
     errors, warnings = validate_file(path)
     assert any(e["code"] in {"E_SNAPSHOT", "E_REQUIRED"} for e in errors)
+
+
+def test_snapshot_gzb64_size_cap_and_truncation(tmp_path, base_mu):
+    from mimo_spec.tools.codec import gz_compress
+
+    big = gz_compress(b"x" * 5_000_000)
+    mimo = base_mu
+    mimo["snapshot"]["payload"] = {"text_gz_b64": base64.b64encode(big).decode("ascii")}
+    errors, warnings = validate_file(_write(tmp_path, mimo))
+    assert errors == []
+    assert "W_SNAPSHOT" in [w["code"] for w in warnings]
+
+    mimo["snapshot"]["payload"] = {"text_gz_b64": base64.b64encode(big[:-8]).decode("ascii")}
+    errors, warnings = validate_file(_write(tmp_path, mimo))
+    assert [e["code"] for e in errors] == ["E_SNAPSHOT"]
+
+
+def test_snapshot_gzb64_multi_member(tmp_path, base_mu):
+    from mimo_spec.tools.codec import gz_compress
+
+    # a second member is decoded too, so it counts towards the size cap
+    two = gz_compress(b"x" * 3_000_000) + gz_compress(b"y" * 3_000_000)
+    mimo = base_mu
+    mimo["snapshot"]["payload"] = {"text_gz_b64": base64.b64encode(two).decode("ascii")}
+    errors, warnings = validate_file(_write(tmp_path, mimo))
+    assert errors == []
+    assert "W_SNAPSHOT" in [w["code"] for w in warnings]
+
+    # zero padding after a member is skipped, as gzip.decompress does
+    padded = gz_compress(b"hi") + b"\0" * 7
+    mimo["snapshot"]["payload"] = {"text_gz_b64": base64.b64encode(padded).decode("ascii")}
+    assert validate_file(_write(tmp_path, mimo))[0] == []
+
+    junk = gz_compress(b"hi") + b"trailing junk"
+    mimo["snapshot"]["payload"] = {"text_gz_b64": base64.b64encode(junk).decode("ascii")}
+    errors, warnings = validate_file(_write(tmp_path, mimo))
+    assert [e["code"] for e in errors] == ["E_SNAPSHOT"]
+
+
+def test_snapshot_zstdb64_multi_frame_and_trailing_bytes(tmp_path, base_mu):
+    zstandard = pytest.importorskip("zstandard")
+    frame = zstandard.ZstdCompressor().compress(b"x" * 11_000)
+
+    mimo = base_mu
+    mimo["schema_version"] = "1.2"
+    mimo["snapshot"]["codec"] = "zstd+b64"
+    # both frames are decoded: 22000 bytes, over the 20KB cap
+    mimo["snapshot"]["payload"] = {"text_zstd_b64": base64.b64encode(frame + frame).decode("ascii")}
+    errors, warnings = validate_file(_write(tmp_path, mimo))
+    assert errors == []
+    assert "W_SNAPSHOT" in [w["code"] for w in warnings]
+
+    for tail in (b"trailing junk", b"\0\0"):
+        mimo["snapshot"]["payload"] = {"text_zstd_b64": base64.b64encode(frame + tail).decode("ascii")}
+        errors, warnings = validate_file(_write(tmp_path, mimo))
+        assert [e["code"] for e in errors] == ["E_SNAPSHOT"]
+
+
+def test_snapshot_quick_check_without_decoding(tmp_path, base_mu):
+    from mimo_spec.tools.codec import gz_compress
+
+    mimo = base_mu
+    path = _write(tmp_path, mimo)
+    assert validate_file(path, decode_payloads=False)[0] == []
+
+    # size comes from the gzip trailer, not from inflating the payload
+    big = gz_compress(b"x" * 5_000_000)
+    mimo["snapshot"]["payload"] = {"text_gz_b64": base64.b64encode(big).decode("ascii")}
+    errors, warnings = validate_file(_write(tmp_path, mimo), decode_payloads=False)
+    assert errors == []
+    assert "W_SNAPSHOT" in [w["code"] for w in warnings]
+
+    mimo["snapshot"]["payload"] = {"text_gz_b64": base64.b64encode(b"not gzip at all").decode("ascii")}
+    errors, warnings = validate_file(_write(tmp_path, mimo), decode_payloads=False)
+    assert [e["code"] for e in errors] == ["E_SNAPSHOT"]
+
+
+def test_snapshot_zstdb64(tmp_path, base_mu):
+    from mimo_spec.tools import codec
+
+    mimo = base_mu
+    mimo["snapshot"]["codec"] = "zstd+b64"
+    mimo["snapshot"]["payload"] = {"text_zstd_b64": "KLUv/SACEQAAaGk="}
+
+    # zstd+b64 was added in schema_version 1.2; the 1.1 contract rejects it
+    errors, warnings = validate_file(_write(tmp_path, mimo))
+    assert "E_SCHEMA" in [e["code"] for e in errors]
+
+    mimo["schema_version"] = "1.2"
+    errors, warnings = validate_file(_write(tmp_path, mimo))
+    if codec.zstandard is not None:
+        assert errors == []
+    else:
+        # the codec is in the contract; only decoding needs the optional package
+        assert [e["code"] for e in errors] == ["E_SNAPSHOT"]
+        assert "zstandard" in errors[0]["msg"]
+
+    # a frame cut short is an error, not an empty (or shorter) snapshot
+    mimo["snapshot"]["payload"] = {"text_zstd_b64": "KLUv/SACEQAA"}
+    errors, warnings = validate_file(_write(tmp_path, mimo))
+    assert [e["code"] for e in errors] == ["E_SNAPSHOT"]
+
+
+def test_main_cache_reuses_unchanged_results(tmp_path, capsys, monkeypatch, base_mu):
+    data = tmp_path / "mus"
+    data.mkdir()
+    mimo = base_mu
+    (data / "a.mimo").write_text(yaml.safe_dump(mimo, allow_unicode=True), encoding="utf-8")
+    args = ["--in", str(data), "--cache-dir", str(tmp_path / "cache"), "--jobs", "1"]
+
+    assert mimo_validate.main(args) == 0
+    first = capsys.readouterr().out
+
+    calls = []
+    monkeypatch.setattr(mimo_validate, "validate_file", lambda p, **kw: calls.append(p) or ([], []))
+    assert mimo_validate.main(args) == 0
+    assert capsys.readouterr().out == first
+    assert calls == []
+
+    # a rewrite (different size) is validated again
+    mimo["summary"] = "changed"
+    (data / "a.mimo").write_text(yaml.safe_dump(mimo, allow_unicode=True), encoding="utf-8")
+    mimo_validate.main(args)
+    assert len(calls) == 1
+
+
+def test_cached_validation_of_vanished_file(tmp_path):
+    gone = tmp_path / "gone.mimo"
+    cache: dict = {}
+    ((errors, warnings),) = mimo_validate.validate_many_cached([gone], cache)
+    assert [e["code"] for e in errors] == ["E_YAML"]
+    assert cache == {}